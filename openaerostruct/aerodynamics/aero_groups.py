@@ -6,6 +6,29 @@ from openaerostruct.aerodynamics.functionals import VLMFunctionals
 from openaerostruct.functionals.total_aero_performance import TotalAeroPerformance
 
 
+# Connections made for every lifting surface in AeroPoint, given as
+# (source, target) pairs where "{name}" is replaced by the surface name.
+_SURFACE_CONNECTIONS = [
+    ("{name}.normals", "aero_states.{name}_normals"),
+    # Connect the results from 'aero_states' to the performance groups
+    ("aero_states.{name}_sec_forces", "{name}_perf.sec_forces"),
+    # Connect S_ref for performance calcs
+    ("{name}.S_ref", "{name}_perf.S_ref"),
+    ("{name}.widths", "{name}_perf.widths"),
+    ("{name}.chords", "{name}_perf.chords"),
+    ("{name}.lengths", "{name}_perf.lengths"),
+    ("{name}.lengths_spanwise", "{name}_perf.lengths_spanwise"),
+    # Connect to the total performance group
+    ("{name}.S_ref", "total_perf.{name}_S_ref"),
+    ("{name}.widths", "total_perf.{name}_widths"),
+    ("{name}.chords", "total_perf.{name}_chords"),
+    ("{name}.b_pts", "total_perf.{name}_b_pts"),
+    ("{name}_perf.CL", "total_perf.{name}_CL"),
+    ("{name}_perf.CD", "total_perf.{name}_CD"),
+    ("aero_states.{name}_sec_forces", "total_perf.{name}_sec_forces"),
+]
+
+
 class AeroPoint(om.Group):
     """
     This group contains all the components needed for a single-point aerodynamic
@@ -30,30 +53,17 @@ class AeroPoint(om.Group):
         surfaces = self.options["surfaces"]
         rotational = self.options["rotational"]
 
-        # Loop through each surface and connect relevant parameters
+        # Loop through each surface and connect relevant parameters.
+        # Also check for ground effect so that 'height_agl' can be promoted.
+        ground_effect = False
         for surface in surfaces:
             name = surface["name"]
 
-            self.connect(name + ".normals", "aero_states." + name + "_normals")
-
-            # Connect the results from 'aero_states' to the performance groups
-            self.connect("aero_states." + name + "_sec_forces", name + "_perf" + ".sec_forces")
-
-            # Connect S_ref for performance calcs
-            self.connect(name + ".S_ref", name + "_perf.S_ref")
-            self.connect(name + ".widths", name + "_perf.widths")
-            self.connect(name + ".chords", name + "_perf.chords")
-            self.connect(name + ".lengths", name + "_perf.lengths")
-            self.connect(name + ".lengths_spanwise", name + "_perf.lengths_spanwise")
+            if surface.get("groundplane", False):
+                ground_effect = True
 
-            # Connect S_ref for performance calcs
-            self.connect(name + ".S_ref", "total_perf." + name + "_S_ref")
-            self.connect(name + ".widths", "total_perf." + name + "_widths")
-            self.connect(name + ".chords", "total_perf." + name + "_chords")
-            self.connect(name + ".b_pts", "total_perf." + name + "_b_pts")
-            self.connect(name + "_perf" + ".CL", "total_perf." + name + "_CL")
-            self.connect(name + "_perf" + ".CD", "total_perf." + name + "_CD")
-            self.connect("aero_states." + name + "_sec_forces", "total_perf." + name + "_sec_forces")
+            for src, tgt in _SURFACE_CONNECTIONS:
+                self.connect(src.format(name=name), tgt.format(name=name))
 
             self.add_subsystem(name, VLMGeometry(surface=surface))
 
@@ -63,12 +73,6 @@ class AeroPoint(om.Group):
         # this component requires information from all surfaces because
         # each surface interacts with the others.
 
-        # check for ground effect and if so, promote
-        ground_effect = False
-        for surface in surfaces:
-            if surface.get("groundplane", False):
-                ground_effect = True
-
         if self.options["compressible"] is True:
             aero_states = CompressibleVLMStates(surfaces=surfaces, rotational=rotational)
             prom_in = ["v", "alpha", "beta", "rho", "Mach_number"]
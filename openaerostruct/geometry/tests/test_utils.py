@@ -0,0 +1,158 @@
+import unittest
+
+import numpy as np
+from openmdao.utils.assert_utils import assert_near_equal
+
+from openaerostruct.geometry.utils import (
+    _chord_spacing,
+    _get_crm_raw_mesh,
+    _span_spacing,
+    add_chordwise_panels,
+    gen_crm_mesh,
+    gen_rect_mesh,
+    generate_mesh,
+    rotate,
+    shear_x,
+    shear_y,
+    shear_z,
+)
+
+
+class Test(unittest.TestCase):
+    def test_rotate_complex_mesh_real_angles(self):
+        # Half wing with dihedral so that the x-rotation depends on the mesh
+        mesh = gen_rect_mesh(3, 9, 10.0, 1.0)[:, :5, :]
+        mesh[:, :, 2] = np.linspace(1.0, 0.0, 5)
+        theta_y = np.linspace(5.0, 0.0, 5)
+
+        # Perturb the z-coordinate of a leading-edge node, which moves the quarter chord
+        node = (0, 1, 2)
+        h_cs = 1e-30
+        h_fd = 1e-6
+
+        mesh_cs = mesh.astype(complex)
+        mesh_cs[node] += 1j * h_cs
+        rotate(mesh_cs, theta_y, True)
+        deriv_cs = mesh_cs.imag / h_cs
+
+        mesh_plus = mesh.copy()
+        mesh_plus[node] += h_fd
+        rotate(mesh_plus, theta_y, True)
+        mesh_minus = mesh.copy()
+        mesh_minus[node] -= h_fd
+        rotate(mesh_minus, theta_y, True)
+        deriv_fd = (mesh_plus - mesh_minus) / (2 * h_fd)
+
+        # Make sure the perturbation affects more than the perturbed node itself
+        self.assertGreater(np.count_nonzero(np.abs(deriv_fd) > 1e-3), 1)
+        assert_near_equal(deriv_cs, deriv_fd, 1e-6)
+
+    def test_crm_interpolation(self):
+        # The CRM edges are interpolated with a shared bracket search, check it against np.interp
+        num_y = 15
+        ny2 = (num_y + 1) // 2
+        for wing_type in ["CRM:jig", "CRM:alpha_2.75", "CRM:alpha_2.50"]:
+            raw_mesh, eta, _ = _get_crm_raw_mesh(wing_type)
+            for span_cos_spacing in [0.0, 0.5, 1.0, 2.0]:
+                mesh, _, _ = gen_crm_mesh(2, num_y, span_cos_spacing, 0.0, wing_type)
+
+                # Right half of the mesh, going from the root to the tip
+                right_mesh = mesh[:, ny2 - 1 :, :]
+
+                stations = _span_spacing(ny2, span_cos_spacing)[::-1]
+                expected = np.empty((2, ny2, 3))
+                for j in range(2):
+                    for i in range(3):
+                        expected[j, :, i] = np.interp(stations, eta, raw_mesh[j, :, i])
+
+                assert_near_equal(right_mesh, expected, 1e-14)
+
+                # Stations exactly on or beyond the end points of the raw data
+                # reproduce the end slices exactly, like np.interp does
+                at_root = stations <= eta[0]
+                at_tip = stations >= eta[-1]
+                self.assertTrue(at_tip[-1])
+                for mask, end in [(at_root, 0), (at_tip, -1)]:
+                    np.testing.assert_array_equal(
+                        right_mesh[:, mask, :], np.broadcast_to(raw_mesh[:, [end], :], (2, mask.sum(), 3))
+                    )
+                if span_cos_spacing == 0.0:
+                    self.assertTrue(at_root[0])
+                if span_cos_spacing == 2.0:
+                    self.assertGreater(at_tip.sum(), 1)
+
+    def test_mesh_dtype(self):
+        mesh = gen_rect_mesh(3, 7, 10.0, 1.0)
+        self.assertEqual(mesh.dtype, np.float64)
+        mesh, _, _ = gen_crm_mesh(3, 7)
+        self.assertEqual(mesh.dtype, np.float64)
+
+        mesh = gen_rect_mesh(3, 7, 10.0, 1.0, dtype=np.float32)
+        self.assertEqual(mesh.dtype, np.float32)
+        assert_near_equal(mesh, gen_rect_mesh(3, 7, 10.0, 1.0), 1e-6)
+
+        for num_x in [2, 3]:
+            mesh, _, _ = gen_crm_mesh(num_x, 7, dtype=np.float32)
+            self.assertEqual(mesh.dtype, np.float32)
+            assert_near_equal(mesh, gen_crm_mesh(num_x, 7)[0], 1e-6)
+
+    def test_numpy_spacing_values(self):
+        # Spacing values given as numpy scalars or 0-d arrays must work with the cached spacing
+        for spacing in [np.float64(0.5), np.array(0.5)]:
+            assert_near_equal(
+                gen_rect_mesh(np.int64(3), 7, 10.0, 2.0, span_cos_spacing=spacing, chord_cos_spacing=spacing),
+                gen_rect_mesh(3, 7, 10.0, 2.0, span_cos_spacing=0.5, chord_cos_spacing=0.5),
+                1e-15,
+            )
+            assert_near_equal(
+                gen_crm_mesh(4, 7, span_cos_spacing=spacing, chord_cos_spacing=spacing)[0],
+                gen_crm_mesh(4, 7, span_cos_spacing=0.5, chord_cos_spacing=0.5)[0],
+                1e-15,
+            )
+
+            mesh = gen_rect_mesh(2, 7, 10.0, 2.0)
+            assert_near_equal(add_chordwise_panels(mesh, 5, spacing), add_chordwise_panels(mesh, 5, 0.5), 1e-15)
+
+            mesh_dict = {
+                "num_x": 3,
+                "num_y": 7,
+                "wing_type": "rect",
+                "symmetry": True,
+                "span_cos_spacing": spacing,
+                "chord_cos_spacing": spacing,
+            }
+            mesh = generate_mesh(mesh_dict)
+            self.assertEqual(mesh.shape, (3, 4, 3))
+
+    def test_cached_spacing_read_only(self):
+        for spacing in [_span_spacing(4, 0.5), _chord_spacing(3, 0.5)]:
+            self.assertFalse(spacing.flags.writeable)
+            with self.assertRaises(ValueError):
+                spacing[0] = 1.0
+
+    def test_shear(self):
+        base_mesh = gen_rect_mesh(3, 7, 10.0, 1.0)
+        num_y = base_mesh.shape[1]
+
+        for axis, shear in enumerate([shear_x, shear_y, shear_z]):
+            # A zero shear leaves the mesh unchanged
+            mesh = base_mesh.copy()
+            shear(mesh, np.zeros(num_y))
+            np.testing.assert_array_equal(mesh, base_mesh)
+
+            # A nonzero shear moves only the requested coordinate
+            mesh = base_mesh.copy()
+            delta = np.linspace(0.0, 1.0, num_y)
+            shear(mesh, delta)
+            expected = base_mesh.copy()
+            expected[:, :, axis] += delta
+            np.testing.assert_array_equal(mesh, expected)
+
+            # A shear that does not match the mesh raises, even when it is zero
+            for bad_shear in [np.zeros(num_y + 1), np.ones(num_y + 1)]:
+                with self.assertRaises(ValueError):
+                    shear(base_mesh.copy(), bad_shear)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
+from functools import lru_cache
+
 import numpy as np
-from numpy import cos, sin, tan
+from numpy import arctan, cos, sin, tan
 import warnings
 
 # openvsp python interface
@@ -13,6 +15,23 @@ except ImportError:
 from openaerostruct.geometry.CRM_definitions import get_crm_points
 
 
+def _quarter_chord(mesh):
+    """
+    Compute the quarter-chord points of a mesh.
+
+    Parameters
+    ----------
+    mesh[nx, ny, 3] : numpy array
+        Nodal mesh defining the aerodynamic surface.
+
+    Returns
+    -------
+    quarter_chord[ny, 3] : numpy array
+        Quarter-chord point at each spanwise station.
+    """
+    return 0.25 * mesh[-1] + 0.75 * mesh[0]
+
+
 def rotate(mesh, theta_y, symmetry, rotate_x=True):
     """
     Compute rotation matrices given mesh and rotation angles in degrees.
@@ -35,39 +54,41 @@ def rotate(mesh, theta_y, symmetry, rotate_x=True):
         Nodal mesh defining the twisted aerodynamic surface.
 
     """
-    te = mesh[-1]
-    le = mesh[0]
-    quarter_chord = 0.25 * te + 0.75 * le
+    quarter_chord = _quarter_chord(mesh)
 
     nx, ny, _ = mesh.shape
 
     if rotate_x:
+        rad_theta_x = np.empty(ny, dtype=quarter_chord.dtype)
+
         # Compute spanwise z displacements along quarter chord
         if symmetry:
             dz_qc = quarter_chord[:-1, 2] - quarter_chord[1:, 2]
             dy_qc = quarter_chord[:-1, 1] - quarter_chord[1:, 1]
-            theta_x = np.arctan(dz_qc / dy_qc)
+            rad_theta_x[:-1] = arctan(dz_qc / dy_qc)
 
-            # Prepend with 0 so that root is not rotated
-            rad_theta_x = np.append(theta_x, 0.0)
+            # Set the root to 0 so that it is not rotated
+            rad_theta_x[-1] = 0.0
         else:
             root_index = int((ny - 1) / 2)
             dz_qc_left = quarter_chord[:root_index, 2] - quarter_chord[1 : root_index + 1, 2]
             dy_qc_left = quarter_chord[:root_index, 1] - quarter_chord[1 : root_index + 1, 1]
-            theta_x_left = np.arctan(dz_qc_left / dy_qc_left)
+            rad_theta_x[:root_index] = arctan(dz_qc_left / dy_qc_left)
             dz_qc_right = quarter_chord[root_index + 1 :, 2] - quarter_chord[root_index:-1, 2]
             dy_qc_right = quarter_chord[root_index + 1 :, 1] - quarter_chord[root_index:-1, 1]
-            theta_x_right = np.arctan(dz_qc_right / dy_qc_right)
+            rad_theta_x[root_index + 1 :] = arctan(dz_qc_right / dy_qc_right)
 
-            # Concatenate thetas
-            rad_theta_x = np.concatenate((theta_x_left, np.zeros(1), theta_x_right))
+            # Set the root to 0 so that it is not rotated
+            rad_theta_x[root_index] = 0.0
 
     else:
         rad_theta_x = 0.0
 
-    rad_theta_y = theta_y * np.pi / 180.0
+    p180 = np.pi / 180.0
+    rad_theta_y = theta_y * p180
 
-    mats = np.zeros((ny, 3, 3), dtype=type(rad_theta_y[0]))
+    # Stay real unless either the mesh or the angles are complex (complex step)
+    mats = np.zeros((ny, 3, 3), dtype=np.result_type(mesh, theta_y, float))
 
     cos_rtx = cos(rad_theta_x)
     cos_rty = cos(rad_theta_y)
@@ -83,7 +104,11 @@ def rotate(mesh, theta_y, symmetry, rotate_x=True):
     mats[:, 2, 1] = sin_rtx
     mats[:, 2, 2] = cos_rtx * cos_rty
 
-    mesh[:] = np.einsum("ikj, mij -> mik", mats, mesh - quarter_chord) + quarter_chord
+    # Batched 3x3 matrix-vector product for every node about its quarter-chord
+    # point, shifting the mesh in place rather than through temporaries
+    mesh -= quarter_chord
+    mesh[:] = np.matmul(mats, mesh[..., np.newaxis])[..., 0]
+    mesh += quarter_chord
 
 
 def scale_x(mesh, chord_dist):
@@ -102,14 +127,9 @@ def scale_x(mesh, chord_dist):
     mesh[nx, ny, 3] : numpy array
         Nodal mesh with the new chord lengths.
     """
-    te = mesh[-1]
-    le = mesh[0]
-    quarter_chord = 0.25 * te + 0.75 * le
+    quarter_chord = _quarter_chord(mesh)
 
-    ny = mesh.shape[1]
-
-    for i in range(ny):
-        mesh[:, i, 0] = (mesh[:, i, 0] - quarter_chord[i, 0]) * chord_dist[i] + quarter_chord[i, 0]
+    mesh[:, :, 0] = (mesh[:, :, 0] - quarter_chord[:, 0]) * chord_dist + quarter_chord[:, 0]
 
 
 def shear_x(mesh, xshear):
@@ -128,6 +148,12 @@ def shear_x(mesh, xshear):
     mesh[nx, ny, 3] : numpy array
         Nodal mesh with the new chord lengths.
     """
+    # Leave the mesh untouched if there is no shear to apply, after checking
+    # that the shear fits the mesh just as the update below would
+    if not np.any(xshear):
+        np.broadcast_to(xshear, mesh.shape[:2])
+        return
+
     mesh[:, :, 0] += xshear
 
 
@@ -146,6 +172,12 @@ def shear_y(mesh, yshear):
     mesh[nx, ny, 3] : numpy array
         Nodal mesh with the new span widths.
     """
+    # Leave the mesh untouched if there is no shear to apply, after checking
+    # that the shear fits the mesh just as the update below would
+    if not np.any(yshear):
+        np.broadcast_to(yshear, mesh.shape[:2])
+        return
+
     mesh[:, :, 1] += yshear
 
 
@@ -165,6 +197,12 @@ def shear_z(mesh, zshear):
     mesh[nx, ny, 3] : numpy array
         Nodal mesh with the new chord lengths.
     """
+    # Leave the mesh untouched if there is no shear to apply, after checking
+    # that the shear fits the mesh just as the update below would
+    if not np.any(zshear):
+        np.broadcast_to(zshear, mesh.shape[:2])
+        return
+
     mesh[:, :, 2] += zshear
 
 
@@ -277,9 +315,7 @@ def stretch(mesh, span, symmetry):
     """
 
     # Set the span along the quarter-chord line
-    le = mesh[0]
-    te = mesh[-1]
-    quarter_chord = 0.25 * te + 0.75 * le
+    quarter_chord = _quarter_chord(mesh)
 
     # The user always deals with the full span, so if they input a specific
     # span value and have symmetry enabled, we divide this value by 2.
@@ -314,33 +350,96 @@ def taper(mesh, taper_ratio, symmetry):
 
     """
 
-    # Get mesh parameters and the quarter-chord
-    le = mesh[0]
-    te = mesh[-1]
-    num_x, num_y, _ = mesh.shape
-    quarter_chord = 0.25 * te + 0.75 * le
-    x = quarter_chord[:, 1]
+    # Get the quarter-chord
+    quarter_chord = _quarter_chord(mesh)
+    x = quarter_chord[:, 1].real
     span = x[-1] - x[0]
 
-    # If symmetric, solve for the correct taper ratio, which is a linear
-    # interpolation problem
+    # If symmetric, the taper varies linearly from taper_ratio at the tip
+    # (y = -span) to 1 at the root (y = 0)
     if symmetry:
-        xp = np.array([-span, 0.0])
-        fp = np.array([taper_ratio, 1.0])
+        eta = -x / span
 
-    # Otherwise, we set up an interpolation problem for the entire wing, which
-    # consists of two linear segments
+    # Otherwise, the taper for the entire wing consists of two linear segments
+    # from taper_ratio at either tip (y = -span / 2, span / 2) to 1 at the root
     else:
-        xp = np.array([-span / 2, 0.0, span / 2])
-        fp = np.array([taper_ratio, 1.0, taper_ratio])
+        eta = np.abs(x) / (span / 2)
 
-    taper = np.interp(x.real, xp.real, fp.real)
+    # Hold the end values outside of the segments, like a linear interpolation
+    taper = 1.0 - (1.0 - taper_ratio.real) * np.clip(eta, 0.0, 1.0)
 
     # Modify the mesh based on the taper amount computed per spanwise section
-    mesh[:] = np.einsum("ijk, j->ijk", mesh - quarter_chord, taper) + quarter_chord
+    mesh[:] = (mesh - quarter_chord) * taper[:, np.newaxis] + quarter_chord
+
+
+@lru_cache(maxsize=64)
+def _span_spacing(ny2, span_cos_spacing):
+    """
+    Blend uniform and cosine spacing for the spanwise nodes of half a wing.
+    The result is cached since it only depends on the arguments, so callers
+    must pass plain (hashable) int and float values.
+
+    Parameters
+    ----------
+    ny2 : int
+        Number of spanwise node points on half of the wing.
+    span_cos_spacing : float
+        Blending ratio of uniform and cosine spacing. A value of 0. corresponds
+        to uniform spacing and a value of 1. corresponds to regular cosine spacing.
+
+    Returns
+    -------
+    lins[ny2] : numpy array
+        Read-only normalized spanwise node locations, from 1 at the tip to 0 at
+        the root.
+    """
+    beta = np.linspace(0, np.pi / 2, ny2)
+
+    # Distribution for cosine spacing
+    cosine = np.cos(beta)
+
+    # Distribution for uniform spacing
+    uniform = np.linspace(1.0, 0.0, ny2)
+
+    # Combine the two distrubtions using span_cos_spacing as the weighting factor.
+    # span_cos_spacing == 1. is for fully cosine, 0. for uniform
+    lins = cosine * span_cos_spacing + (1 - span_cos_spacing) * uniform
+    lins.setflags(write=False)
+
+    return lins
+
+
+@lru_cache(maxsize=64)
+def _chord_spacing(num_x, chord_cos_spacing):
+    """
+    Blend uniform and cosine spacing for the chordwise nodes of a wing.
+    The result is cached since it only depends on the arguments, so callers
+    must pass plain (hashable) int and float values.
+
+    Parameters
+    ----------
+    num_x : int
+        Number of chordwise node points.
+    chord_cos_spacing : float
+        Blending ratio of uniform and cosine spacing. A value of 0. corresponds
+        to uniform spacing and a value of 1. corresponds to regular cosine spacing.
 
+    Returns
+    -------
+    wing_x[num_x] : numpy array
+        Read-only normalized chordwise node locations, from 0 at the leading
+        edge to 1 at the trailing edge.
+    """
+    cosine = 0.5 * (1 - np.cos(np.linspace(0, np.pi, num_x)))  # cosine spacing from 0 to 1
+    uniform = np.linspace(0, 1, num_x)  # uniform spacing
+    # mixed spacing with chord_cos_spacing as a weighting factor
+    wing_x = cosine * chord_cos_spacing + (1 - chord_cos_spacing) * uniform
+    wing_x.setflags(write=False)
+
+    return wing_x
 
-def gen_rect_mesh(num_x, num_y, span, chord, span_cos_spacing=0.0, chord_cos_spacing=0.0):
+
+def gen_rect_mesh(num_x, num_y, span, chord, span_cos_spacing=0.0, chord_cos_spacing=0.0, dtype=float):
     """
     Generate simple rectangular wing mesh.
 
@@ -364,6 +463,8 @@ def gen_rect_mesh(num_x, num_y, span, chord, span_cos_spacing=0.0, chord_cos_spa
         A value of 0. corresponds to uniform spacing and a value of 1.
         corresponds to regular cosine spacing. This increases the number of
         chordwise node points near the wingtips.
+    dtype : data-type (optional)
+        Data type of the returned mesh. Defaults to float64.
 
     Returns
     -------
@@ -372,7 +473,7 @@ def gen_rect_mesh(num_x, num_y, span, chord, span_cos_spacing=0.0, chord_cos_spa
         specified parameters.
     """
 
-    mesh = np.zeros((num_x, num_y, 3))
+    mesh = np.zeros((num_x, num_y, 3), dtype=dtype)
     ny2 = (num_y + 1) // 2
 
     # --- spanwise discretization ---
@@ -383,77 +484,45 @@ def gen_rect_mesh(num_x, num_y, span, chord, span_cos_spacing=0.0, chord_cos_spa
         # mixed spacing with span_cos_spacing as a weighting factor
         # this is for the spanwise spacing
         cosine = 0.25 * (1 - np.cos(beta))  # cosine spacing
-        uniform = np.linspace(0, 0.5, ny2)[::-1]  # uniform spacing
+        uniform = np.linspace(0.5, 0.0, ny2)  # uniform spacing
         half_wing = cosine[::-1] * span_cos_spacing + (1 - span_cos_spacing) * uniform
         full_wing = np.hstack((-half_wing[:-1], half_wing[::-1])) * span
 
     else:
-        beta = np.linspace(0, np.pi / 2, ny2)
-
         # mixed spacing with span_cos_spacing as a weighting factor
         # this is for the spanwise spacing
-        cosine = 0.5 * np.cos(beta)  # cosine spacing
-        uniform = np.linspace(0, 0.5, ny2)[::-1]  # uniform spacing
-        half_wing = cosine * span_cos_spacing + (1 - span_cos_spacing) * uniform
+        half_wing = 0.5 * _span_spacing(int(ny2), float(span_cos_spacing))
         full_wing = np.hstack((-half_wing[:-1], half_wing[::-1])) * span
 
     # --- chordwise discretization ---
-    cosine = 0.5 * (1 - np.cos(np.linspace(0, np.pi, num_x)))  # cosine spacing from 0 to 1
-    uniform = np.linspace(0, 1, num_x)  # uniform spacing
-    # mixed spacing with chord_cos_spacing as a weighting factor
-    wing_x = cosine * chord_cos_spacing + (1 - chord_cos_spacing) * uniform
-    wing_x *= chord  # apply chord length
+    wing_x = _chord_spacing(int(num_x), float(chord_cos_spacing)) * chord  # apply chord length
 
     # --- form 3D mesh array ---
-    for ind_x in range(num_x):
-        for ind_y in range(num_y):
-            mesh[ind_x, ind_y, :] = [wing_x[ind_x], full_wing[ind_y], 0]
+    mesh[:, :, 0] = wing_x[:, np.newaxis]
+    mesh[:, :, 1] = full_wing
 
     return mesh
 
 
-def gen_crm_mesh(num_x, num_y, span_cos_spacing=0.0, chord_cos_spacing=0.0, wing_type="CRM:jig"):
+@lru_cache(maxsize=8)
+def _get_crm_raw_mesh(wing_type):
     """
-    Generate Common Research Model wing mesh.
+    Get the leading and trailing edges of the raw CRM slices, converted to
+    meters. The result is cached per wing_type since the CRM data is static.
 
     Parameters
     ----------
-    num_x : float
-        Desired number of chordwise node points for the final mesh.
-    num_y : float
-        Desired number of chordwise node points for the final mesh.
-    span : float
-        Total wingspan.
-    chord : float
-        Root chord.
-    span_cos_spacing : float (optional)
-        Blending ratio of uniform and cosine spacing in the spanwise direction.
-        A value of 0. corresponds to uniform spacing and a value of 1.
-        corresponds to regular cosine spacing. This increases the number of
-        spanwise node points near the wingtips.
-    chord_cos_spacing : float (optional)
-        Blending ratio of uniform and cosine spacing in the chordwise direction.
-        A value of 0. corresponds to uniform spacing and a value of 1.
-        corresponds to regular cosine spacing. This increases the number of
-        chordwise node points near the wingtips.
-    wing_type : string (optional)
-        Describes the desired CRM shape. Current options are:
-        "CRM:jig" (undeformed jig shape),
-        "CRM:alpha_2.75" (shape from wind tunnel testing at a=2.75 from DPW6)
+    wing_type : string
+        Describes the desired CRM shape. See `gen_crm_mesh` for the options.
 
     Returns
     -------
-    mesh[nx, ny, 3] : numpy array
-        Rectangular nodal mesh defining the final aerodynamic surface with the
-        specified parameters.
-    eta : numpy array
-        Spanwise locations of the airfoil slices. Later used in the
-        interpolation function to obtain correct twist values at
-        points along the span that are not aligned with these slices.
-    twist : numpy array
-        Twist along the span at the spanwise eta locations. We use these twists
-        as training points for interpolation to obtain twist values at
-        arbitrary points along the span.
+    raw_mesh[2, n, 3] : numpy array
+        Read-only leading and trailing edge points at the n raw CRM slices.
+    eta[n] : numpy array
+        Read-only spanwise locations of the raw CRM slices.
+    twist[n] : numpy array
+        Read-only twist at the raw CRM slices, in the correct order.
 
     """
 
@@ -492,26 +561,79 @@ def gen_crm_mesh(num_x, num_y, span_cos_spacing=0.0, chord_cos_spacing=0.0, wing
     # Convert the mesh points to meters from inches.
     raw_mesh = mesh * 0.0254
 
-    # Create the blended spacing using the user input for span_cos_spacing
-    ny2 = (num_y + 1) // 2
-    beta = np.linspace(0, np.pi / 2, ny2)
+    # These arrays are shared between calls, so make sure nobody modifies them
+    for arr in (raw_mesh, eta, twist):
+        arr.setflags(write=False)
 
-    # Distribution for cosine spacing
-    cosine = np.cos(beta)
+    return raw_mesh, eta, twist
 
-    # Distribution for uniform spacing
-    uniform = np.linspace(0, 1.0, ny2)[::-1]
 
-    # Combine the two distrubtions using span_cos_spacing as the weighting factor.
-    # span_cos_spacing == 1. is for fully cosine, 0. for uniform
-    lins = cosine * span_cos_spacing + (1 - span_cos_spacing) * uniform
+def gen_crm_mesh(num_x, num_y, span_cos_spacing=0.0, chord_cos_spacing=0.0, wing_type="CRM:jig", dtype=float):
+    """
+    Generate Common Research Model wing mesh.
+
+    Parameters
+    ----------
+    num_x : float
+        Desired number of chordwise node points for the final mesh.
+    num_y : float
+        Desired number of chordwise node points for the final mesh.
+    span : float
+        Total wingspan.
+    chord : float
+        Root chord.
+    span_cos_spacing : float (optional)
+        Blending ratio of uniform and cosine spacing in the spanwise direction.
+        A value of 0. corresponds to uniform spacing and a value of 1.
+        corresponds to regular cosine spacing. This increases the number of
+        spanwise node points near the wingtips.
+    chord_cos_spacing : float (optional)
+        Blending ratio of uniform and cosine spacing in the chordwise direction.
+        A value of 0. corresponds to uniform spacing and a value of 1.
+        corresponds to regular cosine spacing. This increases the number of
+        chordwise node points near the wingtips.
+    wing_type : string (optional)
+        Describes the desired CRM shape. Current options are:
+        "CRM:jig" (undeformed jig shape),
+        "CRM:alpha_2.75" (shape from wind tunnel testing at a=2.75 from DPW6)
+    dtype : data-type (optional)
+        Data type of the returned mesh. Defaults to float64.
+
+    Returns
+    -------
+    mesh[nx, ny, 3] : numpy array
+        Rectangular nodal mesh defining the final aerodynamic surface with the
+        specified parameters.
+    eta : numpy array
+        Spanwise locations of the airfoil slices. Later used in the
+        interpolation function to obtain correct twist values at
+        points along the span that are not aligned with these slices.
+    twist : numpy array
+        Twist along the span at the spanwise eta locations. We use these twists
+        as training points for interpolation to obtain twist values at
+        arbitrary points along the span.
+
+    """
+
+    # Get the leading and trailing edges of the raw CRM points in meters,
+    # along with the spanwise locations and twist of the slices.
+    # These are cached per wing_type, so copy what we hand back to the user.
+    raw_mesh, eta, twist = _get_crm_raw_mesh(wing_type)
+    eta = eta.copy()
+    twist = twist.copy()
+
+    # Create the blended spacing using the user input for span_cos_spacing
+    ny2 = (num_y + 1) // 2
+    lins = _span_spacing(int(ny2), float(span_cos_spacing))
 
     # Populate a mesh object with the desired num_y dimension based on
-    # interpolated values from the raw CRM points.
-    mesh = np.empty((2, ny2, 3))
-    for j in range(2):
-        for i in range(3):
-            mesh[j, :, i] = np.interp(lins[::-1], eta, raw_mesh[j, :, i].real)
+    # interpolated values from the raw CRM points. Every coordinate of both
+    # edges is interpolated to the same stations, so find the bracketing raw
+    # slices and the linear weights once and apply them to all of them.
+    eta_new = lins[::-1]
+    idx = np.clip(np.searchsorted(eta, eta_new, side="right"), 1, eta.size - 1)
+    w = np.clip((eta_new - eta[idx - 1]) / (eta[idx] - eta[idx - 1]), 0.0, 1.0)[:, np.newaxis]
+    mesh = (1 - w) * raw_mesh[:, idx - 1, :].real + w * raw_mesh[:, idx, :].real
 
     # That is just one half of the mesh and we later expect the full mesh,
     # even if we're using symmetry == True.
@@ -522,7 +644,7 @@ def gen_crm_mesh(num_x, num_y, span_cos_spacing=0.0, chord_cos_spacing=0.0, wing
     if num_x > 2:
         full_mesh = add_chordwise_panels(full_mesh, num_x, chord_cos_spacing)
 
-    return full_mesh, eta, twist
+    return full_mesh.astype(dtype, copy=False), eta, twist
 
 
 def add_chordwise_panels(mesh, num_x, chord_cos_spacing):
@@ -554,24 +676,20 @@ def add_chordwise_panels(mesh, num_x, chord_cos_spacing):
     num_y = mesh.shape[1]
 
     # chordwise discretization
-    cosine = 0.5 * (1 - np.cos(np.linspace(0, np.pi, num_x)))  # cosine spacing from 0 to 1
-    uniform = np.linspace(0, 1, num_x)  # uniform spacing
-    # mixed spacing with chord_cos_spacing as a weighting factor
-    wing_x = cosine * chord_cos_spacing + (1 - chord_cos_spacing) * uniform
+    wing_x = _chord_spacing(int(num_x), float(chord_cos_spacing))
 
     # Obtain the leading and trailing edges
     le = mesh[0, :, :]
     te = mesh[-1, :, :]
 
-    # Create a new mesh with the desired num_x and set the leading and trailing edge values
+    # Create a new mesh with the desired num_x by interpolating between the
+    # leading and trailing edges, then set the edges exactly
+    w = wing_x[:, np.newaxis, np.newaxis]
     new_mesh = np.zeros((num_x, num_y, 3))
+    new_mesh[:] = (1 - w) * le + w * te
     new_mesh[0, :, :] = le
     new_mesh[-1, :, :] = te
 
-    for i in range(1, num_x - 1):
-        w = wing_x[i]
-        new_mesh[i, :, :] = (1 - w) * le + w * te
-
     return new_mesh
 
 
@@ -1073,12 +1191,21 @@ def getFullMesh(left_mesh=None, right_mesh=None):
     elif left_mesh is not None and right_mesh is not None:
         raise ValueError("Please only provide either left or right mesh, not both.")
     elif left_mesh is not None:
-        right_mesh = np.flip(left_mesh, axis=1).copy()
-        right_mesh[:, :, 1] *= -1
+        nx, ny, _ = left_mesh.shape
+        full_mesh = np.empty((nx, 2 * ny - 1, 3), dtype=left_mesh.dtype)
+
+        # Write the given half as-is and mirror it into the other half,
+        # skipping the duplicated root slice
+        full_mesh[:, :ny, :] = left_mesh
+        full_mesh[:, ny:, :] = left_mesh[:, -2::-1, :]
+        full_mesh[:, ny:, 1] *= -1
     else:
-        left_mesh = np.flip(right_mesh, axis=1).copy()
-        left_mesh[:, :, 1] *= -1
-    full_mesh = np.concatenate((left_mesh, right_mesh[:, 1:, :]), axis=1)
+        nx, ny, _ = right_mesh.shape
+        full_mesh = np.empty((nx, 2 * ny - 1, 3), dtype=right_mesh.dtype)
+
+        full_mesh[:, :ny, :] = right_mesh[:, ::-1, :]
+        full_mesh[:, :ny, 1] *= -1
+        full_mesh[:, ny:, :] = right_mesh[:, 1:, :]
     return full_mesh
 
 